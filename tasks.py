@@ -1,10 +1,23 @@
+import argparse
 import curses
+import heapq
+import json
+import os
+import shlex
+import shutil
+import subprocess
+import sys
+import time
 import uuid
-from datetime import datetime
+from collections import OrderedDict, deque
+from collections.abc import MutableMapping
+from contextlib import closing
+from datetime import datetime, timedelta
+from itertools import count, islice
 import sqlite3
 
 class Task:
-    def __init__(self, task_id, name, due_date, ticket_ref, description, status="Pending"):
+    def __init__(self, task_id, name, due_date, ticket_ref, description, status="Pending", project=None):
         self.id = task_id
         self.name = name
         self.due_date = due_date if due_date else (datetime.now().replace(hour=23, minute=59, second=59).strftime('%Y-%m-%d %H:%M:%S'))
@@ -13,6 +26,7 @@ class Task:
         self.status = status
         self.comments = []
         self.dependencies = []
+        self.project = project  # Nazwa projektu (bazy) w przestrzeni roboczej
 
     def add_comment(self, comment):
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
@@ -22,19 +36,749 @@ class Task:
         if task.id not in self.dependencies:
             self.dependencies.append(task.id)
 
+class Workspace:
+    """Bazy projektów otwarte razem: odczyty przez ATTACH DATABASE, każdy projekt to osobny shard"""
+    MAX_ATTACHED = 10  # Domyślny limit SQLITE_MAX_ATTACHED; pierwsza baza jest "main"
+
+    def __init__(self, db_files):
+        self.projects = OrderedDict()  # nazwa projektu -> (plik bazy, schemat w połączeniu)
+        seen = set()
+        for db_file in db_files:
+            if os.path.abspath(db_file) in seen:
+                continue
+            seen.add(os.path.abspath(db_file))
+            base = os.path.splitext(os.path.basename(db_file))[0] or "project"
+            name = base
+            suffix = 1
+            while name in self.projects:
+                name = f"{base}_{suffix}"
+                suffix += 1
+            self.projects[name] = (db_file, "main" if not self.projects else f"p{len(self.projects)}")
+
+    @property
+    def primary(self):
+        return next(iter(self.projects))
+
+    def db_file(self, project=None):
+        return self.projects[project or self.primary][0]
+
+    def shards(self):
+        return [(project, schema) for project, (_, schema) in self.projects.items()]
+
+    def connect(self):
+        files = list(self.projects.values())
+        conn = sqlite3.connect(files[0][0])
+        for db_file, schema in files[1:]:
+            conn.execute(f'ATTACH DATABASE ? AS {schema}', (db_file,))
+        return conn
+
+    def project_of(self, conn, task_id):
+        for project, schema in self.shards():
+            if conn.execute(f'SELECT 1 FROM {schema}.tasks WHERE id = ?', (task_id,)).fetchone():
+                return project
+        return None
+
+    def fetch_tasks(self, conn, ids):
+        # Jedno zapytanie na paczkę zadań, komentarzy i zależności w każdym shardzie
+        tasks = {}
+        dependency_exists = self.task_exists_sql("d.dependency_id")
+        for project, schema in self.shards():
+            remaining = [task_id for task_id in ids if task_id not in tasks]
+            for start in range(0, len(remaining), 500):
+                chunk = remaining[start:start + 500]
+                found = []
+                for row in conn.execute(f'SELECT id, name, due_date, ticket_ref, description, status '
+                                             f'FROM {schema}.tasks WHERE id IN ({",".join("?" * len(chunk))})',
+                                             chunk):
+                    tasks[row[0]] = Task(*row, project=project)
+                    found.append(row[0])
+                if not found:
+                    continue
+                marks = ",".join("?" * len(found))
+                for task_id, comment, timestamp in conn.execute(
+                        f'SELECT task_id, comment, timestamp FROM {schema}.comments '
+                        f'WHERE task_id IN ({marks}) ORDER BY rowid', found):
+                    tasks[task_id].comments.append(f"[{timestamp}] {comment}")
+                for task_id, dependency_id in conn.execute(
+                        f'SELECT d.task_id, d.dependency_id FROM {schema}.dependencies d '
+                        f'WHERE d.task_id IN ({marks}) AND {dependency_exists} ORDER BY d.rowid', found):
+                    tasks[task_id].dependencies.append(dependency_id)
+            if len(tasks) == len(ids):
+                break
+        return tasks
+
+    def task_exists_sql(self, column):
+        # Zależności mogą wskazywać na zadania z innych projektów
+        return "(" + " OR ".join(f'EXISTS (SELECT 1 FROM {schema}.tasks WHERE id = {column})'
+                                 for _, schema in self.shards()) + ")"
+
+class MemoryTaskStore(dict):
+    """Domyślny magazyn: wszystkie zadania trzymane w pamięci"""
+
+    def window(self, start, limit):
+        return list(islice(self.values(), max(0, start), max(0, start) + limit))
+
+    def index_of(self, task_id):
+        for idx, key in enumerate(self):
+            if key == task_id:
+                return idx
+        return -1
+
+    def dependents(self, task_id):
+        return [t for t in self.values() if task_id in t.dependencies]
+
+    def cache_stats(self):
+        return None
+
+class LRUTaskStore(MutableMapping):
+    """Magazyn o ograniczonej pamięci: LRU zadań w pamięci, reszta stronicowana z SQLite (shard po shardzie)"""
+
+    def __init__(self, workspace, max_cached=1000, page_size=200):
+        self.workspace = workspace
+        self.shards = workspace.shards()
+        self.max_cached = max(1, max_cached)
+        self.page_size = max(1, page_size)
+        self.cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._counts = {}   # schemat -> liczba zadań w shardzie
+        self._anchors = {}  # schemat -> (pozycja, rowid) początku ostatnio pobranego okna
+        self.conn = workspace.connect()
+
+    def _remember(self, task):
+        self.cache[task.id] = task
+        self.cache.move_to_end(task.id)
+        while len(self.cache) > self.max_cached:
+            self.cache.popitem(last=False)
+            self.evictions += 1
+
+    def _load(self, ids):
+        found = {task_id: self.cache[task_id] for task_id in ids if task_id in self.cache}
+        missing = [task_id for task_id in ids if task_id not in found]
+        self.hits += len(found)
+        self.misses += len(missing)
+        if missing:
+            found.update(self.workspace.fetch_tasks(self.conn, missing))
+        result = []
+        for task_id in ids:
+            task = found.get(task_id)
+            if task:
+                self._remember(task)
+                result.append(task)
+        return result
+
+    def _pages(self, schema):
+        last_rowid = -2 ** 63
+        while True:
+            rows = self.conn.execute(f'SELECT rowid, id FROM {schema}.tasks WHERE rowid > ? ORDER BY rowid LIMIT ?',
+                                     (last_rowid, self.page_size)).fetchall()
+            if not rows:
+                return
+            yield [row[1] for row in rows]
+            last_rowid = rows[-1][0]
+
+    def _schema_of(self, task_id):
+        task = self.cache.get(task_id)
+        if task:
+            return self.workspace.projects[task.project][1]
+        for _, schema in self.shards:
+            if self.conn.execute(f'SELECT 1 FROM {schema}.tasks WHERE id = ?', (task_id,)).fetchone():
+                return schema
+        return None
+
+    def _shard_len(self, schema):
+        if schema not in self._counts:
+            self._counts[schema] = self.conn.execute(f'SELECT COUNT(*) FROM {schema}.tasks').fetchone()[0]
+        return self._counts[schema]
+
+    def _forget_shard(self, schema):
+        # Liczniki i kotwice innych shardów zostają ważne
+        if schema is None:
+            self._counts.clear()
+            self._anchors.clear()
+        else:
+            self._counts.pop(schema, None)
+            self._anchors.pop(schema, None)
+
+    def __getitem__(self, task_id):
+        tasks = self._load([task_id])
+        if not tasks:
+            raise KeyError(task_id)
+        return tasks[0]
+
+    def __setitem__(self, task_id, task):
+        self._remember(task)
+        self._counts.pop(self.workspace.projects[task.project or self.workspace.primary][1], None)
+
+    def __delitem__(self, task_id):
+        self._forget_shard(self._schema_of(task_id))
+        self.cache.pop(task_id, None)
+
+    def __contains__(self, task_id):
+        return task_id in self.cache or self._schema_of(task_id) is not None
+
+    def __iter__(self):
+        for _, schema in self.shards:
+            for ids in self._pages(schema):
+                yield from ids
+
+    def __len__(self):
+        return sum(self._shard_len(schema) for _, schema in self.shards)
+
+    def values(self):
+        # Shardy są łączone leniwie - kolejny projekt czytamy dopiero po wyczerpaniu poprzedniego
+        for _, schema in self.shards:
+            for ids in self._pages(schema):
+                yield from self._load(ids)
+
+    def items(self):
+        for task in self.values():
+            yield task.id, task
+
+    def _window_rows(self, schema, start, limit):
+        anchor = self._anchors.get(schema)
+        if anchor and start >= anchor[0]:
+            rows = self.conn.execute(f'SELECT rowid, id FROM {schema}.tasks WHERE rowid >= ? '
+                                     f'ORDER BY rowid LIMIT ? OFFSET ?',
+                                     (anchor[1], limit, start - anchor[0])).fetchall()
+        elif anchor:
+            # Cofamy się od kotwicy po rowid zamiast liczyć OFFSET od początku tabeli
+            row = self.conn.execute(f'SELECT rowid FROM {schema}.tasks WHERE rowid < ? '
+                                    f'ORDER BY rowid DESC LIMIT 1 OFFSET ?',
+                                    (anchor[1], anchor[0] - start - 1)).fetchone()
+            rows = self.conn.execute(f'SELECT rowid, id FROM {schema}.tasks WHERE rowid >= ? ORDER BY rowid LIMIT ?',
+                                     (row[0], limit)).fetchall() if row else []
+        else:
+            rows = self.conn.execute(f'SELECT rowid, id FROM {schema}.tasks ORDER BY rowid LIMIT ? OFFSET ?',
+                                     (limit, start)).fetchall()
+        if rows:
+            self._anchors[schema] = (start, rows[0][0])
+        return [row[1] for row in rows]
+
+    def window(self, start, limit):
+        ids = []
+        offset = max(0, start)
+        for _, schema in self.shards:
+            if limit <= 0:
+                break
+            size = self._shard_len(schema)
+            if offset >= size:
+                offset -= size
+                continue
+            shard_ids = self._window_rows(schema, offset, limit)
+            ids.extend(shard_ids)
+            limit -= len(shard_ids)
+            offset = 0
+        return self._load(ids)
+
+    def index_of(self, task_id):
+        position = 0
+        for _, schema in self.shards:
+            row = self.conn.execute(f'SELECT (SELECT COUNT(*) FROM {schema}.tasks WHERE rowid < t.rowid) '
+                                    f'FROM {schema}.tasks t WHERE t.id = ?', (task_id,)).fetchone()
+            if row:
+                return position + row[0]
+            position += self._shard_len(schema)
+        return -1
+
+    def dependents(self, task_id):
+        ids = []
+        for _, schema in self.shards:
+            rows = self.conn.execute(f'SELECT DISTINCT t.id FROM {schema}.dependencies d '
+                                     f'JOIN {schema}.tasks t ON t.id = d.task_id '
+                                     f'WHERE d.dependency_id = ? ORDER BY t.rowid', (task_id,)).fetchall()
+            ids.extend(row[0] for row in rows)
+        return self._load(ids)
+
+    def cache_stats(self):
+        return {
+            "cached": len(self.cache),
+            "limit": self.max_cached,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+class ReminderScheduler:
+    """Przypomnienia o terminach: kopiec (czas wywołania, ...) aktualizowany przy każdej edycji zadania"""
+
+    def __init__(self, lead_times, notify):
+        self.lead_times = sorted({max(0, int(minutes)) for minutes in lead_times}, reverse=True)
+        self.notify = notify
+        self.heap = []
+        self.versions = {}  # task_id -> wersja; wpisy kopca ze starszą wersją są nieaktualne
+        self.fired = set()  # (task_id, due_date, lead) - żeby nie powtarzać przypomnień
+        self.counter = count()
+
+    @staticmethod
+    def parse_due_date(due_date):
+        for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M', '%Y-%m-%d'):
+            try:
+                parsed = datetime.strptime(due_date.strip(), fmt)
+            except (AttributeError, ValueError):
+                continue
+            # Sama data oznacza koniec dnia, tak jak domyślny termin w Task
+            return parsed.replace(hour=23, minute=59, second=59) if fmt == '%Y-%m-%d' else parsed
+        return None
+
+    @staticmethod
+    def describe_lead(minutes):
+        if minutes == 0:
+            return "now"
+        if minutes % 1440 == 0:
+            return f"in {minutes // 1440} day(s)"
+        if minutes % 60 == 0:
+            return f"in {minutes // 60} h"
+        return f"in {minutes} min"
+
+    def _entries(self, task_id, name, due_date, status, now):
+        self.versions.pop(task_id, None)
+        due = self.parse_due_date(due_date)
+        if status == "Completed" or not due or due <= now:
+            return []
+        version = next(self.counter)
+        self.versions[task_id] = version
+        entries = []
+        for lead in self.lead_times:
+            if (task_id, due_date, lead) in self.fired:
+                continue
+            fire_at = due - timedelta(minutes=lead)
+            if fire_at <= now:
+                # Z przypomnień, których czas już minął, zostawiamy tylko najbliższe terminowi
+                entries = [(now, next(self.counter), task_id, version, lead, name, due_date)]
+            else:
+                entries.append((fire_at, next(self.counter), task_id, version, lead, name, due_date))
+        return entries
+
+    def load(self, rows, now=None):
+        now = now or datetime.now()
+        self.versions = {}
+        self.heap = []
+        for task_id, name, due_date, status in rows:
+            self.heap.extend(self._entries(task_id, name, due_date, status, now))
+        heapq.heapify(self.heap)
+
+    def schedule(self, task, now=None):
+        self.update(task.id, task.name, task.due_date, task.status, now)
+
+    def update(self, task_id, name, due_date, status, now=None):
+        for entry in self._entries(task_id, name, due_date, status, now or datetime.now()):
+            heapq.heappush(self.heap, entry)
+        # Nieaktualne wpisy usuwamy leniwie; przebudowa, gdy zaczynają przeważać
+        if len(self.heap) > 64 and len(self.heap) > 4 * len(self.versions) * max(1, len(self.lead_times)):
+            self.heap = [entry for entry in self.heap if self.versions.get(entry[2]) == entry[3]]
+            heapq.heapify(self.heap)
+
+    def unschedule(self, task_id):
+        self.versions.pop(task_id, None)
+
+    def next_fire(self):
+        while self.heap and self.versions.get(self.heap[0][2]) != self.heap[0][3]:
+            heapq.heappop(self.heap)
+        return self.heap[0][0] if self.heap else None
+
+    def poll(self, now=None):
+        now = now or datetime.now()
+        due_now = {}
+        while self.next_fire() is not None and self.heap[0][0] <= now:
+            _, _, task_id, version, lead, name, due_date = heapq.heappop(self.heap)
+            self.fired.add((task_id, due_date, lead))
+            # Spóźnione odpytanie (np. po dialogu) - jak w _entries zostaje tylko przypomnienie najbliższe terminowi
+            previous = due_now.get((task_id, version))
+            if previous is None or lead < previous[0]:
+                due_now[(task_id, version)] = (lead, name, due_date)
+        fired = []
+        for _, name, due_date in due_now.values():
+            # Opis liczymy z faktycznego czasu do terminu - zaległe przypomnienie odpala się później niż lead
+            minutes_left = round((self.parse_due_date(due_date) - now).total_seconds() / 60)
+            if minutes_left < 0:
+                message = f"'{name}' is overdue ({due_date})"
+            else:
+                message = f"'{name}' is due {self.describe_lead(minutes_left)} ({due_date})"
+            fired.append(message)
+            self.notify(message)
+        return fired
+
+class ChangeJournal:
+    """Dziennik zmian tylko do dopisywania: cofanie/ponawianie, migawki i odtwarzanie stanu z chwili w czasie.
+
+    Każda zmiana to wpis (op, before, after) zapisany w tej samej transakcji co sama zmiana.
+    Odwrotność wpisu to znowu wpis, więc cofnięcia też trafiają do dziennika i odtwarzają się przy replay.
+    Trzymamy tylko keep_snapshots ostatnich migawek, więc odtwarzanie sięga najwyżej do najstarszej z nich.
+    """
+    INVERSE = {"upsert": "upsert", "comment": "uncomment", "uncomment": "comment",
+               "delete": "restore", "restore": "delete"}
+    UNDO_LIMIT = 200
+
+    def __init__(self, workspace, snapshot_every=500, keep_snapshots=5):
+        self.workspace = workspace
+        self.snapshot_every = max(1, snapshot_every)
+        self.keep_snapshots = max(1, keep_snapshots)
+        self.pending_snapshots = set()  # projekty, którym należy się migawka w wolnej chwili
+        self.undo_stack = []  # paczki wpisów (jedna paczka = jedna akcja użytkownika)
+        self.redo_stack = []
+
+    @staticmethod
+    def dumps(value):
+        return None if value is None else json.dumps(value, separators=(",", ":"))
+
+    @staticmethod
+    def loads(value):
+        return None if value is None else json.loads(value)
+
+    @staticmethod
+    def task_state(conn, schema, task_id, with_comments=False):
+        row = conn.execute(f'SELECT id, name, due_date, ticket_ref, description, status '
+                           f'FROM {schema}.tasks WHERE id = ?', (task_id,)).fetchone()
+        if not row:
+            return None
+        state = {
+            "task": list(row),
+            "dependencies": [dep for (dep,) in conn.execute(
+                f'SELECT dependency_id FROM {schema}.dependencies WHERE task_id = ? ORDER BY rowid', (task_id,))],
+        }
+        if with_comments:
+            state["comments"] = [list(comment) for comment in conn.execute(
+                f'SELECT comment, timestamp FROM {schema}.comments WHERE task_id = ? ORDER BY rowid', (task_id,))]
+        return state
+
+    @staticmethod
+    def apply(conn, schema, task_id, op, before, after):
+        if op in ("upsert", "restore") and after is not None:
+            conn.execute(f'''INSERT INTO {schema}.tasks (id, name, due_date, ticket_ref, description, status)
+                             VALUES (?, ?, ?, ?, ?, ?)
+                             ON CONFLICT(id) DO UPDATE SET name = excluded.name, due_date = excluded.due_date,
+                                 ticket_ref = excluded.ticket_ref, description = excluded.description,
+                                 status = excluded.status''', after["task"])
+            conn.execute(f'DELETE FROM {schema}.dependencies WHERE task_id = ?', (task_id,))
+            conn.executemany(f'INSERT INTO {schema}.dependencies (task_id, dependency_id) VALUES (?, ?)',
+                             [(task_id, dep) for dep in after["dependencies"]])
+            conn.executemany(f'INSERT INTO {schema}.comments (task_id, comment, timestamp) VALUES (?, ?, ?)',
+                             [(task_id, comment, timestamp) for comment, timestamp in after.get("comments", [])])
+        elif op in ("upsert", "delete"):
+            conn.execute(f'DELETE FROM {schema}.dependencies WHERE task_id = ? OR dependency_id = ?',
+                         (task_id, task_id))
+            conn.execute(f'DELETE FROM {schema}.comments WHERE task_id = ?', (task_id,))
+            conn.execute(f'DELETE FROM {schema}.tasks WHERE id = ?', (task_id,))
+        elif op == "comment":
+            conn.execute(f'INSERT INTO {schema}.comments (task_id, comment, timestamp) VALUES (?, ?, ?)',
+                         (task_id, after[0], after[1]))
+        elif op == "uncomment":
+            conn.execute(f'DELETE FROM {schema}.comments WHERE rowid = (SELECT rowid FROM {schema}.comments '
+                         f'WHERE task_id = ? AND comment = ? AND timestamp = ? ORDER BY rowid DESC LIMIT 1)',
+                         (task_id, before[0], before[1]))
+
+    def begin(self):
+        return {"id": uuid.uuid4().hex, "entries": []}
+
+    def record(self, conn, project, batch, task_id, op, before, after):
+        schema = self.workspace.projects[project][1]
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        seq = conn.execute(f'INSERT INTO {schema}.journal (batch, timestamp, task_id, op, before, after) '
+                           f'VALUES (?, ?, ?, ?, ?, ?)',
+                           (batch["id"], timestamp, task_id, op, self.dumps(before), self.dumps(after))).lastrowid
+        batch["entries"].append((project, seq))
+        # Okresowa migawka ogranicza odtwarzanie do migawki i krótkiego ogona dziennika;
+        # robimy ją poza transakcją edycji, gdy użytkownik nic nie robi
+        if seq % self.snapshot_every == 0:
+            self.pending_snapshots.add(project)
+        return seq
+
+    def change(self, conn, project, batch, task_id, op, before, after):
+        self.apply(conn, self.workspace.projects[project][1], task_id, op, before, after)
+        return self.record(conn, project, batch, task_id, op, before, after)
+
+    def commit(self, batch):
+        if batch["entries"]:
+            self.undo_stack.append(batch)
+            del self.undo_stack[:-self.UNDO_LIMIT]
+            self.redo_stack.clear()
+
+    def undo(self):
+        return self._revert(self.undo_stack, self.redo_stack)
+
+    def redo(self):
+        return self._revert(self.redo_stack, self.undo_stack)
+
+    def _revert(self, source, target):
+        # Zwraca id zmienionych zadań albo None, gdy nie ma czego cofać
+        if not source:
+            return None
+        batch = source.pop()
+        inverse = self.begin()
+        task_ids = []
+        with closing(self.workspace.connect()) as conn, conn:
+            for project, seq in reversed(batch["entries"]):
+                schema = self.workspace.projects[project][1]
+                task_id, op, before, after = conn.execute(
+                    f'SELECT task_id, op, before, after FROM {schema}.journal WHERE seq = ?', (seq,)).fetchone()
+                self.change(conn, project, inverse, task_id, self.INVERSE[op], self.loads(after), self.loads(before))
+                task_ids.append(task_id)
+        target.append(inverse)
+        return task_ids
+
+    def check_pending_snapshots(self):
+        # Po starcie: projekty, których ogon dziennika urósł ponad interwał od ostatniej migawki
+        with closing(self.workspace.connect()) as conn:
+            for project, schema in self.workspace.shards():
+                tail = conn.execute(f'SELECT (SELECT COALESCE(MAX(seq), 0) FROM {schema}.journal) - '
+                                    f'(SELECT COALESCE(MAX(journal_seq), 0) FROM {schema}.snapshots)').fetchone()[0]
+                if tail >= self.snapshot_every:
+                    self.pending_snapshots.add(project)
+
+    def take_pending_snapshots(self):
+        for project in list(self.pending_snapshots):
+            conn = sqlite3.connect(self.workspace.db_file(project))
+            with closing(conn), conn:
+                # IMMEDIATE blokuje zapisy innych procesów, więc migawka odpowiada dokładnie MAX(seq)
+                conn.execute('BEGIN IMMEDIATE')
+                seq = conn.execute('SELECT COALESCE(MAX(seq), 0) FROM journal').fetchone()[0]
+                if not conn.execute('SELECT 1 FROM snapshots WHERE journal_seq = ?', (seq,)).fetchone():
+                    self.take_snapshot(conn, "main", seq)
+                    self.prune_snapshots(conn, "main", self.keep_snapshots)
+            self.pending_snapshots.discard(project)
+
+    @staticmethod
+    def take_snapshot(conn, schema, seq):
+        # Kopia tabel po stronie SQLite (INSERT ... SELECT) - wiersze nie przechodzą przez Pythona
+        for table in ("snapshots", "snapshot_tasks", "snapshot_dependencies", "snapshot_comments"):
+            conn.execute(f'DELETE FROM {schema}.{table} WHERE journal_seq = ?', (seq,))
+        conn.execute(f'INSERT INTO {schema}.snapshot_tasks (journal_seq, id, name, due_date, ticket_ref, description, status) '
+                     f'SELECT ?, id, name, due_date, ticket_ref, description, status FROM {schema}.tasks ORDER BY rowid',
+                     (seq,))
+        conn.execute(f'INSERT INTO {schema}.snapshot_dependencies (journal_seq, task_id, dependency_id) '
+                     f'SELECT ?, task_id, dependency_id FROM {schema}.dependencies ORDER BY rowid', (seq,))
+        conn.execute(f'INSERT INTO {schema}.snapshot_comments (journal_seq, task_id, comment, timestamp) '
+                     f'SELECT ?, task_id, comment, timestamp FROM {schema}.comments ORDER BY rowid', (seq,))
+        conn.execute(f'INSERT INTO {schema}.snapshots (journal_seq, timestamp) VALUES (?, ?)',
+                     (seq, datetime.now().strftime('%Y-%m-%d %H:%M:%S')))
+
+    @staticmethod
+    def prune_snapshots(conn, schema, keep):
+        # Każda migawka to pełna kopia projektu - starsze niż keep ostatnich usuwamy w tej samej transakcji
+        oldest_kept = conn.execute(f'SELECT journal_seq FROM {schema}.snapshots ORDER BY journal_seq DESC '
+                                   f'LIMIT 1 OFFSET ?', (keep - 1,)).fetchone()
+        if oldest_kept:
+            for table in ("snapshots", "snapshot_tasks", "snapshot_dependencies", "snapshot_comments"):
+                conn.execute(f'DELETE FROM {schema}.{table} WHERE journal_seq < ?', (oldest_kept[0],))
+
+    @staticmethod
+    def load_snapshot(source, schema, seq, target):
+        # Wiersze płyną strumieniowo z kursora do executemany, bez budowania list w pamięci
+        target.executemany('INSERT INTO tasks (id, name, due_date, ticket_ref, description, status) '
+                           'VALUES (?, ?, ?, ?, ?, ?)',
+                           source.execute(f'SELECT id, name, due_date, ticket_ref, description, status '
+                                          f'FROM {schema}.snapshot_tasks WHERE journal_seq = ? ORDER BY rowid', (seq,)))
+        target.executemany('INSERT INTO dependencies (task_id, dependency_id) VALUES (?, ?)',
+                           source.execute(f'SELECT task_id, dependency_id FROM {schema}.snapshot_dependencies '
+                                          f'WHERE journal_seq = ? ORDER BY rowid', (seq,)))
+        target.executemany('INSERT INTO comments (task_id, comment, timestamp) VALUES (?, ?, ?)',
+                           source.execute(f'SELECT task_id, comment, timestamp FROM {schema}.snapshot_comments '
+                                          f'WHERE journal_seq = ? ORDER BY rowid', (seq,)))
+
+    def replay(self, source, schema, target, until):
+        """Odtwarza stan projektu z chwili until w pustej bazie target: najbliższa migawka + ogon dziennika"""
+        snapshot = source.execute(f'SELECT journal_seq FROM {schema}.snapshots WHERE timestamp <= ? '
+                                  f'ORDER BY journal_seq DESC LIMIT 1', (until,)).fetchone()
+        if not snapshot:
+            raise ValueError(f"no snapshot taken at or before {until} (only the last {self.keep_snapshots} are kept)")
+        self.load_snapshot(source, schema, snapshot[0], target)
+        replayed = 0
+        for timestamp, task_id, op, before, after in source.execute(
+                f'SELECT timestamp, task_id, op, before, after FROM {schema}.journal '
+                f'WHERE seq > ? ORDER BY seq', (snapshot[0],)):
+            if timestamp > until:
+                break
+            self.apply(target, "main", task_id, op, self.loads(before), self.loads(after))
+            replayed += 1
+        return replayed
+
+def cycle_members(nodes, successors):
+    """Węzły leżące na cyklach: silnie spójne składowe z więcej niż jednym węzłem (Tarjan, bez rekurencji)
+
+    Przeszukiwanie obejmuje tylko nodes; krawędzie do innych węzłów są pomijane.
+    """
+    allowed = set(nodes)
+    index, lowlink = {}, {}
+    stack, on_stack = [], set()
+    members = set()
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(successors[root]))]
+        while work:
+            node, neighbours = work[-1]
+            for succ in neighbours:
+                if succ not in allowed:
+                    continue
+                if succ not in index:
+                    index[succ] = lowlink[succ] = len(index)
+                    stack.append(succ)
+                    on_stack.add(succ)
+                    work.append((succ, iter(successors[succ])))
+                    break
+                if succ in on_stack:
+                    lowlink[node] = min(lowlink[node], index[succ])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    # Pętle własne są odrzucane przy budowie grafu, więc cykl ma co najmniej dwa węzły
+                    if len(component) > 1:
+                        members.update(component)
+    return members
+
+def analyze_dependency_graph(nodes, edges):
+    """Zablokowane zadania, ścieżka krytyczna i zadania odblokowujące najwięcej pracy - jeden przebieg topologiczny.
+
+    nodes: task_id -> (name, project, due_date, status), edges: pary (task_id, dependency_id)
+    """
+    ids = list(nodes)
+    index = {task_id: i for i, task_id in enumerate(ids)}
+    is_open = [nodes[task_id][3] != "Completed" for task_id in ids]
+    # Terminy jako teksty 'YYYY-MM-DD HH:MM:SS' porównują się leksykograficznie, bez parsowania dat
+    due = [(nodes[task_id][2] or "") + (" 23:59:59" if len(nodes[task_id][2] or "") == 10 else "")
+           for task_id in ids]
+    prereqs = [[] for _ in ids]
+    dependents = [[] for _ in ids]
+    indegree = [0] * len(ids)
+    for task_id, dependency_id in set(edges):
+        v, u = index.get(task_id), index.get(dependency_id)
+        if v is None or u is None or u == v:
+            continue
+        prereqs[v].append(u)
+        dependents[u].append(v)
+        indegree[v] += 1
+
+    # Algorytm Kahna; węzły, które zostały z niezerowym stopniem, leżą na cyklach albo za nimi
+    order = [i for i, degree in enumerate(indegree) if degree == 0]
+    for u in order:
+        for v in dependents[u]:
+            indegree[v] -= 1
+            if indegree[v] == 0:
+                order.append(v)
+    leftover = [i for i, degree in enumerate(indegree) if degree > 0]
+    on_cycle = cycle_members(leftover, dependents)
+    cycles = [ids[i] for i in leftover if i in on_cycle]
+    behind_cycle = [ids[i] for i in leftover if i not in on_cycle]
+
+    # Najdłuższy łańcuch otwartych zadań kończący się w danym węźle
+    depth = [0] * len(ids)
+    previous = [-1] * len(ids)
+    for v in order:
+        best = -1
+        for u in prereqs[v]:
+            if best < 0 or depth[u] > depth[best]:
+                best = u
+        if best >= 0 and depth[best] > 0:
+            depth[v] = depth[best] + is_open[v]
+            previous[v] = best
+        else:
+            depth[v] = int(is_open[v])
+    critical_path = []
+    # Pojedyncze zadanie bez otwartych zależności nie tworzy łańcucha - ścieżka ma co najmniej dwa zadania
+    if order and max(depth[v] for v in order) > 1:
+        # Przy równej długości wygrywa łańcuch kończący się najwcześniejszym terminem
+        node = min(order, key=lambda v: (-depth[v], due[v] or "~"))
+        while node >= 0:
+            if is_open[node]:
+                critical_path.append(ids[node])
+            node = previous[node]
+        critical_path.reverse()
+
+    # Najdłuższy łańcuch otwartej pracy czekającej za danym zadaniem
+    downstream = [0] * len(ids)
+    for u in reversed(order):
+        longest = 0
+        for v in dependents[u]:
+            chain = downstream[v] + is_open[v]
+            if chain > longest:
+                longest = chain
+        downstream[u] = longest
+
+    blocked = []
+    sole_blocker = [0] * len(ids)
+    conflicts = []
+    for v, task_id in enumerate(ids):
+        if not is_open[v]:
+            continue
+        open_prereqs = [u for u in prereqs[v] if is_open[u]]
+        if open_prereqs:
+            blocked.append(task_id)
+        if len(open_prereqs) == 1:
+            sole_blocker[open_prereqs[0]] += 1
+        for u in open_prereqs:
+            if due[u] and due[v] and due[u] > due[v]:
+                conflicts.append((task_id, ids[u]))
+
+    candidates = (i for i in order if is_open[i] and (sole_blocker[i] or downstream[i]))
+    unblockers = [(ids[i], sole_blocker[i], downstream[i])
+                  for i in heapq.nlargest(10, candidates, key=lambda i: (sole_blocker[i], downstream[i]))]
+
+    # Wynik trafia do pamięci podręcznej, więc zachowujemy opisy tylko zadań, które pokazuje raport
+    reported = set(blocked) | set(critical_path) | set(cycles) | set(behind_cycle)
+    reported.update(task_id for task_id, _, _ in unblockers)
+    reported.update(task_id for pair in conflicts for task_id in pair)
+    return {
+        "labels": {task_id: nodes[task_id] for task_id in reported},
+        "task_count": len(ids),
+        "blocked": blocked,
+        "critical_path": critical_path,
+        "unblockers": unblockers,
+        "conflicts": conflicts,
+        "cycles": cycles,
+        "behind_cycle": behind_cycle,
+        "edges": sum(len(p) for p in prereqs),
+    }
+
 class TaskManager:
-    def __init__(self):
-        self.tasks = {}
+    NOTIFICATION_TTL = 300  # sekundy widoczności powiadomienia w TUI
+    SNAPSHOT_IDLE_DELAY = 2.0  # sekundy bez klawisza, po których robimy zaległą migawkę
+
+    def __init__(self, db_files=("tasks.db",), max_cached_tasks=0, page_size=200, lead_times=(60, 15, 0),
+                 snapshot_every=500, keep_snapshots=5):
         self.selected_index = 0
-        self.db_file = "tasks.db"
+        self.scroll_offset = 0
+        self.workspace = Workspace(db_files)
+        self.journal = ChangeJournal(self.workspace, snapshot_every, keep_snapshots)
+        self.db_file = self.workspace.db_file()
         self.show_comments = False  # Nowe pole do przełączania widoczności komentarzy
         self.search_mode = False    # Nowe pole do trybu wyszukiwania
         self.search_results = []    # Lista wyników wyszukiwania
         self.init_db()
-        self.load_tasks_from_db()
+        self.journal.check_pending_snapshots()
+        if max_cached_tasks:
+            # Tryb ograniczonej pamięci - zadania dociągane z bazy na żądanie
+            self.tasks = LRUTaskStore(self.workspace, max_cached_tasks, page_size)
+        else:
+            self.tasks = MemoryTaskStore()
+            self.load_tasks_from_db()
+        self.analysis = None  # Wynik analizy zależności, ważny do następnej zmiany zadań
+        self.notifications = deque(maxlen=20)  # (czas, komunikat)
+        self.reminders = None
+        if lead_times:
+            self.reminders = ReminderScheduler(lead_times, lambda message: self.add_notification(f"⏰ {message}"))
+            self.load_reminders_from_db()
 
     def init_db(self):
-        with sqlite3.connect(self.db_file) as conn:
+        for project in self.workspace.projects:
+            self.init_project_db(self.workspace.db_file(project))
+
+    def init_project_db(self, db_file):
+        with sqlite3.connect(db_file) as conn:
             cursor = conn.cursor()
             cursor.execute('''CREATE TABLE IF NOT EXISTS tasks (
                                 id TEXT PRIMARY KEY,
@@ -55,54 +799,209 @@ class TaskManager:
                                 FOREIGN KEY(task_id) REFERENCES tasks(id),
                                 FOREIGN KEY(dependency_id) REFERENCES tasks(id)
                               )''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_comments_task ON comments(task_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_dependencies_task ON dependencies(task_id)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_dependencies_dependency ON dependencies(dependency_id)')
+            # Dziennik zmian i migawki do cofania oraz odtwarzania
+            cursor.execute('''CREATE TABLE IF NOT EXISTS journal (
+                                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                                batch TEXT,
+                                timestamp TEXT,
+                                task_id TEXT,
+                                op TEXT,
+                                before TEXT,
+                                after TEXT
+                              )''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS snapshots (
+                                journal_seq INTEGER PRIMARY KEY,
+                                timestamp TEXT
+                              )''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS snapshot_tasks (
+                                journal_seq INTEGER,
+                                id TEXT,
+                                name TEXT,
+                                due_date TEXT,
+                                ticket_ref TEXT,
+                                description TEXT,
+                                status TEXT
+                              )''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS snapshot_dependencies (
+                                journal_seq INTEGER,
+                                task_id TEXT,
+                                dependency_id TEXT
+                              )''')
+            cursor.execute('''CREATE TABLE IF NOT EXISTS snapshot_comments (
+                                journal_seq INTEGER,
+                                task_id TEXT,
+                                comment TEXT,
+                                timestamp TEXT
+                              )''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_snapshot_tasks_seq ON snapshot_tasks(journal_seq)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_snapshot_dependencies_seq ON snapshot_dependencies(journal_seq)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_snapshot_comments_seq ON snapshot_comments(journal_seq)')
+            # Migawka bazowa, żeby odtwarzanie obejmowało też dane sprzed założenia dziennika
+            if not cursor.execute('SELECT 1 FROM snapshots LIMIT 1').fetchone():
+                seq = cursor.execute('SELECT COALESCE(MAX(seq), 0) FROM journal').fetchone()[0]
+                ChangeJournal.take_snapshot(conn, "main", seq)
 
     def load_tasks_from_db(self):
-        with sqlite3.connect(self.db_file) as conn:
+        with closing(self.workspace.connect()) as conn:
             cursor = conn.cursor()
-            cursor.execute('SELECT * FROM tasks')
-            rows = cursor.fetchall()
-            for row in rows:
-                task = Task(row[0], row[1], row[2], row[3], row[4], row[5])
-                self.tasks[task.id] = task
-
-            cursor.execute('SELECT task_id, comment, timestamp FROM comments')
-            rows = cursor.fetchall()
-            for task_id, comment, timestamp in rows:
-                if task_id in self.tasks:
-                    self.tasks[task_id].comments.append(f"[{timestamp}] {comment}")
-
-            # Ładowanie zależności
-            cursor.execute('SELECT task_id, dependency_id FROM dependencies')
-            rows = cursor.fetchall()
-            for task_id, dependency_id in rows:
-                if task_id in self.tasks and dependency_id in self.tasks:
-                    self.tasks[task_id].dependencies.append(dependency_id)
+            for project, schema in self.workspace.shards():
+                cursor.execute(f'SELECT * FROM {schema}.tasks')
+                rows = cursor.fetchall()
+                for row in rows:
+                    task = Task(row[0], row[1], row[2], row[3], row[4], row[5], project=project)
+                    self.tasks[task.id] = task
+
+                cursor.execute(f'SELECT task_id, comment, timestamp FROM {schema}.comments')
+                rows = cursor.fetchall()
+                for task_id, comment, timestamp in rows:
+                    if task_id in self.tasks:
+                        self.tasks[task_id].comments.append(f"[{timestamp}] {comment}")
+
+            # Ładowanie zależności - dopiero po wszystkich projektach, bo mogą je przekraczać
+            for _, schema in self.workspace.shards():
+                cursor.execute(f'SELECT task_id, dependency_id FROM {schema}.dependencies')
+                rows = cursor.fetchall()
+                for task_id, dependency_id in rows:
+                    if task_id in self.tasks and dependency_id in self.tasks:
+                        self.tasks[task_id].dependencies.append(dependency_id)
+
+    def load_reminders_from_db(self):
+        with closing(self.workspace.connect()) as conn:
+            query = " UNION ALL ".join(f"SELECT id, name, due_date, status FROM {schema}.tasks "
+                                       f"WHERE status IS NOT 'Completed'" for _, schema in self.workspace.shards())
+            self.reminders.load(conn.execute(query))
+
+    def load_dependency_graph(self):
+        # Graf czytamy prosto z bazy, żeby nie hydratować wszystkich zadań w trybie LRU
+        nodes = {}
+        edges = []
+        with closing(self.workspace.connect()) as conn:
+            for project, schema in self.workspace.shards():
+                for task_id, name, due_date, status in conn.execute(
+                        f'SELECT id, name, due_date, status FROM {schema}.tasks'):
+                    nodes[task_id] = (name, project, due_date, status)
+                edges.extend(conn.execute(f'SELECT task_id, dependency_id FROM {schema}.dependencies'))
+        return nodes, edges
+
+    def analyze_dependencies(self):
+        if self.analysis is None:
+            self.analysis = analyze_dependency_graph(*self.load_dependency_graph())
+        return self.analysis
+
+    def sync_reminders_from_journal(self, conn, last_seen, since=None):
+        """Przeplanowuje tylko zadania z wpisów dziennika po last_seen[projekt]; aktualizuje last_seen.
+
+        since to chwila poprzedniego sprawdzenia - terminy, które minęły od tamtej pory, odpalają się jako zaległe.
+        """
+        for project, schema in self.workspace.shards():
+            rows = conn.execute(f'SELECT seq, task_id FROM {schema}.journal WHERE seq > ? ORDER BY seq',
+                                (last_seen.get(project, 0),)).fetchall()
+            if not rows:
+                continue
+            last_seen[project] = rows[-1][0]
+            task_ids = list(dict.fromkeys(task_id for _, task_id in rows))
+            for start in range(0, len(task_ids), 500):
+                chunk = task_ids[start:start + 500]
+                current = {row[0]: row for row in conn.execute(
+                    f'SELECT id, name, due_date, status FROM {schema}.tasks '
+                    f'WHERE id IN ({",".join("?" * len(chunk))})', chunk)}
+                for task_id in chunk:
+                    if task_id in current:
+                        self.reminders.update(*current[task_id], now=since)
+                    else:
+                        self.reminders.unschedule(task_id)
 
     def save_task_to_db(self, task):
-        with sqlite3.connect(self.db_file) as conn:
-            cursor = conn.cursor()
-            # Zapisz podstawowe informacje o zadaniu
-            cursor.execute('''REPLACE INTO tasks (id, name, due_date, ticket_ref, description, status)
-                              VALUES (?, ?, ?, ?, ?, ?)''',
-                           (task.id, task.name, task.due_date, task.ticket_ref, task.description, task.status))
-            
-            # Zaktualizuj zależności
-            cursor.execute('DELETE FROM dependencies WHERE task_id = ?', (task.id,))
-            for dependency_id in task.dependencies:
-                cursor.execute('INSERT INTO dependencies (task_id, dependency_id) VALUES (?, ?)',
-                             (task.id, dependency_id))
+        self.analysis = None
+        project = task.project or self.workspace.primary
+        schema = self.workspace.projects[project][1]
+        batch = self.journal.begin()
+        with closing(self.workspace.connect()) as conn, conn:
+            before = self.journal.task_state(conn, schema, task.id)
+            # UPSERT zadania i jego zależności (zachowuje rowid, a więc i kolejność zadań)
+            after = {
+                "task": [task.id, task.name, task.due_date, task.ticket_ref, task.description, task.status],
+                "dependencies": list(task.dependencies),
+            }
+            if before != after:
+                self.journal.change(conn, project, batch, task.id, "upsert", before, after)
+        self.journal.commit(batch)
+        # W trybie LRU w cache może siedzieć inna (starsza) kopia tego zadania
+        self.tasks[task.id] = task
 
     def save_comment_to_db(self, task_id, comment):
         timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        with sqlite3.connect(self.db_file) as conn:
-            cursor = conn.cursor()
-            cursor.execute('INSERT INTO comments (task_id, comment, timestamp) VALUES (?, ?, ?)', 
-                         (task_id, comment, timestamp))
-
-    def add_task(self, name, due_date, ticket_ref, description, status="Pending"):
-        task = Task(str(uuid.uuid4()), name, due_date, ticket_ref, description, status)
+        task = self.tasks.get(task_id)
+        batch = self.journal.begin()
+        with closing(self.workspace.connect()) as conn, conn:
+            project = task.project if task else self.workspace.primary
+            self.journal.change(conn, project, batch, task_id, "comment", None, [comment, timestamp])
+        self.journal.commit(batch)
+
+    def reload_tasks(self, task_ids):
+        # Po cofnięciu/ponowieniu odświeżamy tylko zadania, których dotyczyły wpisy dziennika
+        self.analysis = None
+        with closing(self.workspace.connect()) as conn:
+            fresh = self.workspace.fetch_tasks(conn, list(dict.fromkeys(task_ids)))
+        for task_id in task_ids:
+            if task_id in fresh:
+                self.tasks[task_id] = fresh[task_id]
+                if self.reminders:
+                    self.reminders.schedule(fresh[task_id])
+            else:
+                try:
+                    del self.tasks[task_id]
+                except KeyError:
+                    pass
+                if self.reminders:
+                    self.reminders.unschedule(task_id)
+        self.selected_index = max(0, min(self.selected_index, len(self.tasks) - 1))
+
+    def undo(self):
+        task_ids = self.journal.undo()
+        if task_ids is None:
+            return False
+        self.reload_tasks(task_ids)
+        return True
+
+    def redo(self):
+        task_ids = self.journal.redo()
+        if task_ids is None:
+            return False
+        self.reload_tasks(task_ids)
+        return True
+
+    def recover_to(self, until, out_file, project=None):
+        """Zapisuje do nowego pliku stan projektu z chwili until; zwraca liczbę odtworzonych wpisów dziennika"""
+        if os.path.exists(out_file):
+            raise FileExistsError(out_file)
+        schema = self.workspace.projects[project or self.workspace.primary][1]
+        # Dziennik porównuje znaczniki czasu jako teksty, więc sprowadzamy until do tego samego formatu;
+        # sama data oznacza koniec dnia, a 'T' z zapisu ISO zamieniamy na spację
+        parsed = ReminderScheduler.parse_due_date(until.strip().replace("T", " ", 1))
+        if not parsed:
+            raise ValueError(f"invalid timestamp {until!r}, expected 'YYYY-MM-DD[ HH:MM[:SS]]'")
+        until = parsed.strftime('%Y-%m-%d %H:%M:%S')
+        self.init_project_db(out_file)
+        try:
+            with closing(self.workspace.connect()) as source, closing(sqlite3.connect(out_file)) as target, target:
+                replayed = self.journal.replay(source, schema, target, until)
+                ChangeJournal.take_snapshot(target, "main", 0)
+        except Exception:
+            os.remove(out_file)
+            raise
+        return replayed
+
+    def add_task(self, name, due_date, ticket_ref, description, status="Pending", project=None):
+        task = Task(str(uuid.uuid4()), name, due_date, ticket_ref, description, status,
+                    project=project or self.workspace.primary)
         self.tasks[task.id] = task
         self.save_task_to_db(task)
+        if self.reminders:
+            self.reminders.schedule(task)
 
     def edit_task(self, task_id, name=None, due_date=None, ticket_ref=None, description=None, status=None):
         task = self.tasks.get(task_id)
@@ -119,10 +1018,13 @@ class TaskManager:
         if status:
             task.status = status
         self.save_task_to_db(task)
+        if self.reminders and (name or due_date or status):
+            self.reminders.schedule(task)
 
     def get_task_by_index(self, index):
         if 0 <= index < len(self.tasks):
-            return list(self.tasks.values())[index]
+            tasks = self.tasks.window(index, 1)
+            return tasks[0] if tasks else None
         return None
 
     def init_colors(self):
@@ -160,13 +1062,48 @@ class TaskManager:
         except ValueError:
             return "normal"
 
+    def add_notification(self, message):
+        self.notifications.append((time.monotonic(), message))
+
+    def check_reminders(self):
+        """Odpala zaległe przypomnienia i usuwa stare powiadomienia; zwraca True, gdy trzeba przerysować"""
+        changed = bool(self.reminders and self.reminders.poll())
+        while self.notifications and time.monotonic() - self.notifications[0][0] > self.NOTIFICATION_TTL:
+            self.notifications.popleft()
+            changed = True
+        return changed
+
+    def input_timeout_ms(self):
+        # Bez przypomnień, migawek i powiadomień nie ma na co czekać poza klawiszem
+        if not self.reminders and not self.journal.pending_snapshots and not self.notifications:
+            return -1
+        wait = self.SNAPSHOT_IDLE_DELAY if self.journal.pending_snapshots else 30.0
+        next_fire = self.reminders.next_fire() if self.reminders else None
+        if next_fire:
+            wait = min(wait, (next_fire - datetime.now()).total_seconds())
+        if self.notifications:
+            wait = min(wait, self.NOTIFICATION_TTL - (time.monotonic() - self.notifications[0][0]))
+        return max(0, int(wait * 1000)) + 50
+
     def handle_input(self, stdscr):
         self.init_colors()
         curses.curs_set(0)
 
+        redraw = True
         while True:
-            self.render_table(stdscr)
+            self.check_reminders()
+            if redraw:
+                self.render_table(stdscr)
+            # Czekamy na klawisz najwyżej do następnego przypomnienia
+            stdscr.timeout(self.input_timeout_ms())
             key = stdscr.getch()
+            stdscr.timeout(-1)
+            if key == -1:
+                # Bezczynność - dobry moment na zaległe migawki dziennika
+                self.journal.take_pending_snapshots()
+                redraw = self.check_reminders()
+                continue
+            redraw = True
 
             if key == curses.KEY_UP:
                 self.selected_index = max(0, self.selected_index - 1)
@@ -192,6 +1129,12 @@ class TaskManager:
                 self.search_ui(stdscr)
             elif key == ord("x"):
                 self.delete_task_ui(stdscr)
+            elif key == ord("p"):
+                self.dependency_analysis_ui(stdscr)
+            elif key == ord("u"):
+                self.add_notification("Change undone." if self.undo() else "Nothing to undo.")
+            elif key == ord("r"):
+                self.add_notification("Change redone." if self.redo() else "Nothing to redo.")
 
     def render_table(self, stdscr):
         height, width = stdscr.getmaxyx()
@@ -218,6 +1161,11 @@ class TaskManager:
             "Status": 10,    # 10% szerokości
             "Dependencies": 30# 30% szerokości
         }
+        # Kolumna projektu tylko przy kilku bazach w przestrzeni roboczej
+        multi_project = len(self.workspace.projects) > 1
+        if multi_project:
+            column_ratios = {"#": 5, "Project": 10, "Name": 20, "Due Date": 15,
+                             "Ticket Ref": 15, "Status": 10, "Dependencies": 25}
         
         # Oblicz rzeczywiste szerokości kolumn
         column_widths = {}
@@ -243,24 +1191,48 @@ class TaskManager:
         shortcuts = [
             "↑/↓ Navigate", "ENTER View", "A Add", "S Status",
             "C Comment", "D Dependency", "M Comments", "X Delete",
-            "/ Search", "Q Quit"
+            "P Analysis", "U Undo", "R Redo", "/ Search", "Q Quit"
         ]
-        shortcut_str = " | ".join(shortcuts)
-        menu_x = (width - len(shortcut_str)) // 2
+        # Na wąskim ekranie skróty zawijamy do drugiego wiersza ramki
+        shortcut_lines = [""]
+        for shortcut in shortcuts:
+            candidate = f"{shortcut_lines[-1]} | {shortcut}" if shortcut_lines[-1] else shortcut
+            if len(candidate) > width - 6 and shortcut_lines[-1]:
+                shortcut_lines.append(shortcut)
+            else:
+                shortcut_lines[-1] = candidate
         stdscr.addstr(4, 2, "╔" + "═" * (width-4) + "╗", curses.color_pair(9))
-        stdscr.addstr(5, menu_x, shortcut_str, curses.color_pair(9) | curses.A_DIM)
-        stdscr.addstr(6, 2, "╚" + "═" * (width-4) + "╝", curses.color_pair(9))
+        for offset, shortcut_str in enumerate(shortcut_lines[:2]):
+            menu_x = max(3, (width - len(shortcut_str)) // 2)
+            stdscr.addstr(5 + offset, menu_x, shortcut_str[:width-6], curses.color_pair(9) | curses.A_DIM)
+        if len(shortcut_lines) == 1:
+            stdscr.addstr(6, 2, "╚" + "═" * (width-4) + "╝", curses.color_pair(9))
+
+        # Powiadomienia (przypomnienia o terminach, cofanie/ponawianie)
+        if self.notifications:
+            notice = self.notifications[-1][1]
+            if len(self.notifications) > 1:
+                notice += f"  (+{len(self.notifications) - 1} more)"
+            stdscr.addstr(7, 3, notice[:width-6], curses.color_pair(7) | curses.A_BOLD)
 
         # Nagłówki tabeli
-        headers = ["#", "Name", "Due Date", "Ticket Ref", "Status", "Dependencies"]
+        headers = list(column_ratios)
         header_format = "│".join(f"{h:<{column_widths[h]}}" for h in headers)
         stdscr.addstr(8, 2, "┌" + "─" * (width-4) + "┐", curses.color_pair(2))
         stdscr.addstr(9, 2, header_format, curses.color_pair(2) | curses.A_BOLD)
         stdscr.addstr(10, 2, "├" + "─" * (width-4) + "┤", curses.color_pair(2))
 
-        # Zawartość tabeli
+        # Zawartość tabeli - pobieramy tylko wiersze, które mieszczą się na ekranie
         row_offset = 11
-        for idx, task in enumerate(self.tasks.values()):
+        comment_rows = 4 if self.show_comments else 0
+        visible_rows = max(1, height - row_offset - 3 - comment_rows)
+        if self.selected_index < self.scroll_offset:
+            self.scroll_offset = self.selected_index
+        elif self.selected_index >= self.scroll_offset + visible_rows:
+            self.scroll_offset = self.selected_index - visible_rows + 1
+        visible_tasks = self.tasks.window(self.scroll_offset, visible_rows)
+        for pos, task in enumerate(visible_tasks):
+            idx = self.scroll_offset + pos
             prefix = "→" if idx == self.selected_index else " "
             due_status = self.check_due_date(task)
             
@@ -273,11 +1245,13 @@ class TaskManager:
             else:
                 base_color = curses.color_pair(9)
 
-            dependencies = ", ".join([self.tasks[dep].name for dep in task.dependencies if dep in self.tasks])
+            dependencies = ", ".join([self.dependency_label(task, self.tasks[dep])
+                                      for dep in task.dependencies if dep in self.tasks])
             
             # Formatuj każdą kolumnę osobno z odpowiednią szerokością
             row_data = [
                 f"{prefix}{idx}".ljust(column_widths["#"]),
+                *([task.project[:column_widths["Project"]].ljust(column_widths["Project"])] if multi_project else []),
                 task.name[:column_widths["Name"]].ljust(column_widths["Name"]),
                 task.due_date[:column_widths["Due Date"]].ljust(column_widths["Due Date"]),
                 task.ticket_ref[:column_widths["Ticket Ref"]].ljust(column_widths["Ticket Ref"]),
@@ -286,7 +1260,7 @@ class TaskManager:
             ]
             row = "│".join(row_data)
             
-            current_row = row_offset + idx
+            current_row = row_offset + pos
             stdscr.addstr(current_row, 2, row, base_color | curses.A_BOLD if idx == self.selected_index else base_color)
 
             # Komentarze
@@ -298,9 +1272,31 @@ class TaskManager:
                     row_offset += len(task.comments[-3:]) + 1
 
         # Dolna ramka tabeli
-        stdscr.addstr(row_offset + len(self.tasks), 2, "└" + "─" * (width-4) + "┘", curses.color_pair(2))
+        stdscr.addstr(row_offset + len(visible_tasks), 2, "└" + "─" * (width-4) + "┘", curses.color_pair(2))
+        self.render_status_bar(stdscr)
         stdscr.refresh()
 
+    def render_status_bar(self, stdscr):
+        height, width = stdscr.getmaxyx()
+        stats = self.tasks.cache_stats()
+        if not stats:
+            return
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = stats["hits"] / lookups if lookups else 0.0
+        status = (f" Tasks: {len(self.tasks)} │ Cache: {stats['cached']}/{stats['limit']}"
+                  f" │ Hits: {stats['hits']} │ Misses: {stats['misses']}"
+                  f" │ Evictions: {stats['evictions']} │ Hit rate: {hit_rate:.0%} ")
+        try:
+            stdscr.addstr(height-1, 0, status[:width-1], curses.color_pair(10))
+        except curses.error:
+            pass
+
+    def dependency_label(self, task, dependency):
+        # Zależności z innego projektu pokazujemy z prefiksem projektu
+        if dependency.project != task.project:
+            return f"{dependency.project}/{dependency.name}"
+        return dependency.name
+
     def draw_box(self, stdscr, y1, x1, y2, x2):
         """Pomocnicza metoda do rysowania ramek"""
         height, width = stdscr.getmaxyx()
@@ -347,8 +1343,11 @@ class TaskManager:
             ("Ticket Ref", task.ticket_ref),
             ("Description", task.description),
             ("Status", task.status),
-            ("Dependencies", ", ".join([self.tasks[dep].name for dep in task.dependencies if dep in self.tasks])),
+            ("Dependencies", ", ".join([self.dependency_label(task, self.tasks[dep])
+                                        for dep in task.dependencies if dep in self.tasks])),
         ]
+        if len(self.workspace.projects) > 1:
+            fields.insert(0, ("Project", task.project))
 
         # Ramka dla pól
         stdscr.addstr(3, 2, "╔" + "═" * (width-6) + "╗", curses.color_pair(2))
@@ -495,7 +1494,14 @@ class TaskManager:
         status = stdscr.getstr(5, 25, 10).decode("utf-8")
         status = status if status else "Pending"
 
-        self.add_task(name, due_date, ticket_ref, description, status)
+        project = None
+        if len(self.workspace.projects) > 1:
+            prompt = f"Project [{'/'.join(self.workspace.projects)}, empty for {self.workspace.primary}]: "
+            stdscr.addstr(6, 0, prompt)
+            project = stdscr.getstr(6, len(prompt), 50).decode("utf-8")
+            project = project if project in self.workspace.projects else None
+
+        self.add_task(name, due_date, ticket_ref, description, status, project)
         curses.noecho()
         stdscr.addstr(7, 0, "Task added successfully!", curses.color_pair(4) | curses.A_BOLD)
         stdscr.addstr(8, 0, "Press any key to return...", curses.A_DIM)
@@ -518,6 +1524,7 @@ class TaskManager:
 
         task.add_comment(comment)
         self.save_comment_to_db(task.id, comment)
+        self.tasks[task.id] = task
 
         curses.noecho()
         stdscr.addstr(3, 0, "Comment added successfully!", curses.color_pair(4) | curses.A_BOLD)
@@ -585,35 +1592,49 @@ class TaskManager:
             stdscr.getch()
             return
 
-        available_tasks = [t for t in self.tasks.values() if t.id != task.id]  # wykluczamy aktualny task
-        if not available_tasks:
+        # Wykluczamy aktualny task; lista jest stronicowana przez window(), jak tabela główna
+        available_count = len(self.tasks) - 1
+        if available_count <= 0:
             stdscr.addstr(2, 0, "No other tasks available to add as dependency. Press any key to return...", curses.A_DIM)
             stdscr.refresh()
             stdscr.getch()
             return
 
         current_dep_index = 0
+        scroll_offset = 0
         
         while True:
+            height, width = stdscr.getmaxyx()
+            visible_rows = max(1, height - 8)
+            if current_dep_index < scroll_offset:
+                scroll_offset = current_dep_index
+            elif current_dep_index >= scroll_offset + visible_rows:
+                scroll_offset = current_dep_index - visible_rows + 1
+            # Jeden wiersz zapasu na wypadek, gdy aktualny task wypada w oknie
+            visible_tasks = [t for t in self.tasks.window(scroll_offset + (scroll_offset >= self.selected_index),
+                                                          visible_rows + 1) if t.id != task.id][:visible_rows]
+
             stdscr.clear()
             stdscr.addstr(0, 0, "Add Dependency", curses.color_pair(3) | curses.A_BOLD)
             stdscr.addstr(1, 0, f"Selected Task: {task.name}", curses.color_pair(2))
-            stdscr.addstr(2, 0, "Available Tasks:")
+            stdscr.addstr(2, 0, f"Available Tasks ({available_count}):")
 
-            # Wyświetl listę dostępnych zadań
-            for idx, dep_task in enumerate(available_tasks):
+            # Wyświetl widoczną część listy dostępnych zadań
+            for row, dep_task in enumerate(visible_tasks):
+                idx = scroll_offset + row
                 status_color = (curses.color_pair(4) if dep_task.status == "Pending" 
                               else curses.color_pair(3) if dep_task.status == "In Progress"
                               else curses.color_pair(5))
                 
+                label = self.dependency_label(task, dep_task)
                 if idx == current_dep_index:
-                    stdscr.addstr(3 + idx, 0, f"> {dep_task.name} [{dep_task.status}]", 
+                    stdscr.addstr(3 + row, 0, f"> {label} [{dep_task.status}]"[:width-1], 
                                 curses.color_pair(1) | curses.A_BOLD)
                 else:
-                    stdscr.addstr(3 + idx, 2, f"{dep_task.name} [{dep_task.status}]", 
+                    stdscr.addstr(3 + row, 2, f"{label} [{dep_task.status}]"[:width-3], 
                                 status_color)
 
-            stdscr.addstr(len(available_tasks) + 4, 0, 
+            stdscr.addstr(len(visible_tasks) + 4, 0, 
                          "Use UP/DOWN arrows to select, ENTER to confirm, ESC to cancel", 
                          curses.A_DIM)
             stdscr.refresh()
@@ -622,16 +1643,16 @@ class TaskManager:
             if key == curses.KEY_UP:
                 current_dep_index = max(0, current_dep_index - 1)
             elif key == curses.KEY_DOWN:
-                current_dep_index = min(len(available_tasks) - 1, current_dep_index + 1)
+                current_dep_index = min(available_count - 1, current_dep_index + 1)
             elif key == 10 or key == curses.KEY_ENTER:  # Enter
-                dependency_task = available_tasks[current_dep_index]
+                dependency_task = visible_tasks[current_dep_index - scroll_offset]
                 task.add_dependency(dependency_task)
                 self.save_task_to_db(task)
                 
-                stdscr.addstr(len(available_tasks) + 6, 0, 
+                stdscr.addstr(len(visible_tasks) + 6, 0, 
                              "Dependency added successfully!", 
                              curses.color_pair(4) | curses.A_BOLD)
-                stdscr.addstr(len(available_tasks) + 7, 0, 
+                stdscr.addstr(len(visible_tasks) + 7, 0, 
                              "Press any key to return...", 
                              curses.A_DIM)
                 stdscr.refresh()
@@ -691,11 +1712,11 @@ class TaskManager:
                         current_index = min(len(matching_tasks) - 1, current_index)
                     elif key == 10 or key == curses.KEY_ENTER:  # Enter - pokaż szczegóły
                         selected_task = matching_tasks[current_index]
-                        self.selected_index = list(self.tasks.values()).index(selected_task)
+                        self.selected_index = self.tasks.index_of(selected_task.id)
                         self.render_task_details(stdscr, selected_task)
                         break
                     elif key == ord('v'):  # V - wybierz task i wróć do głównego widoku
-                        self.selected_index = list(self.tasks.values()).index(matching_tasks[current_index])
+                        self.selected_index = self.tasks.index_of(matching_tasks[current_index].id)
                         break
                     elif key == 27:  # ESC
                         break
@@ -708,18 +1729,86 @@ class TaskManager:
         curses.noecho()
 
     def delete_task(self, task_id):
-        with sqlite3.connect(self.db_file) as conn:
-            cursor = conn.cursor()
-            # Usuń zależności
-            cursor.execute('DELETE FROM dependencies WHERE task_id = ? OR dependency_id = ?', 
-                         (task_id, task_id))
-            # Usuń komentarze
-            cursor.execute('DELETE FROM comments WHERE task_id = ?', (task_id,))
-            # Usuń task
-            cursor.execute('DELETE FROM tasks WHERE id = ?', (task_id,))
-            
-        if task_id in self.tasks:
-            del self.tasks[task_id]
+        self.analysis = None
+        # Wszystkie projekty w jednej transakcji - zależności mogą wskazywać na task z innego projektu
+        batch = self.journal.begin()
+        dependent_ids = []
+        with closing(self.workspace.connect()) as conn, conn:
+            project = self.workspace.project_of(conn, task_id)
+            if project is None:
+                return
+            # Zadania zależne tracą tę zależność - każde jako osobny wpis w dzienniku swojego projektu
+            for dependent_project, schema in self.workspace.shards():
+                dependents = conn.execute(f'SELECT DISTINCT task_id FROM {schema}.dependencies '
+                                          f'WHERE dependency_id = ? AND task_id != ?', (task_id, task_id)).fetchall()
+                for (dependent_id,) in dependents:
+                    before = self.journal.task_state(conn, schema, dependent_id)
+                    if before is None:
+                        continue
+                    after = dict(before, dependencies=[dep for dep in before["dependencies"] if dep != task_id])
+                    self.journal.change(conn, dependent_project, batch, dependent_id, "upsert", before, after)
+                    dependent_ids.append(dependent_id)
+            before = self.journal.task_state(conn, self.workspace.projects[project][1], task_id, with_comments=True)
+            self.journal.change(conn, project, batch, task_id, "delete", before, None)
+        self.journal.commit(batch)
+        # Pamięć i przypomnienia zmieniamy dopiero po udanej transakcji: usunięte zadanie znika,
+        # a zależne tracą tę zależność (inaczej kolejny zapis by ją przywrócił)
+        self.reload_tasks(dependent_ids + [task_id])
+
+    def dependency_analysis_ui(self, stdscr):
+        analysis = self.analyze_dependencies()
+        labels = analysis["labels"]
+        height, width = stdscr.getmaxyx()
+        stdscr.clear()
+
+        def label(task_id):
+            name, project, due_date, status = labels[task_id]
+            prefix = f"{project}/" if len(self.workspace.projects) > 1 else ""
+            return f"{prefix}{name} [{status}, due {due_date}]"
+
+        lines = [(f"Dependency Analysis - {analysis['task_count']} tasks, {analysis['edges']} dependencies",
+                  curses.color_pair(3) | curses.A_BOLD), ("", 0)]
+
+        path = analysis["critical_path"]
+        lines.append((f"Critical path ({len(path)} open tasks):", curses.color_pair(2)))
+        lines.extend((f"  {idx + 1}. {label(task_id)}", curses.color_pair(9)) for idx, task_id in enumerate(path))
+        if not path:
+            lines.append(("  No open dependency chains.", curses.A_DIM))
+        lines.append(("", 0))
+
+        lines.append(("Unblocks the most work:", curses.color_pair(2)))
+        for task_id, direct, chain in analysis["unblockers"]:
+            lines.append((f"  {label(task_id)} - unblocks {direct} directly, {chain} open task(s) in the longest chain behind it",
+                          curses.color_pair(4)))
+        if not analysis["unblockers"]:
+            lines.append(("  Nothing is waiting on open tasks.", curses.A_DIM))
+        lines.append(("", 0))
+
+        lines.append((f"Blocked by incomplete dependencies ({len(analysis['blocked'])}):", curses.color_pair(2)))
+        lines.extend((f"  {label(task_id)}", curses.color_pair(5)) for task_id in analysis["blocked"])
+
+        if analysis["conflicts"]:
+            lines.append(("", 0))
+            lines.append((f"Due before its dependency ({len(analysis['conflicts'])}):", curses.color_pair(2)))
+            lines.extend((f"  {label(task_id)} <- {label(dep_id)}", curses.color_pair(7))
+                         for task_id, dep_id in analysis["conflicts"])
+        if analysis["cycles"]:
+            lines.append(("", 0))
+            lines.append((f"Dependency cycles ({len(analysis['cycles'])} tasks):", curses.color_pair(2)))
+            lines.extend((f"  {label(task_id)}", curses.color_pair(6)) for task_id in analysis["cycles"])
+        if analysis["behind_cycle"]:
+            lines.append(("", 0))
+            lines.append((f"Blocked behind a cycle ({len(analysis['behind_cycle'])} tasks):", curses.color_pair(2)))
+            lines.extend((f"  {label(task_id)}", curses.color_pair(6)) for task_id in analysis["behind_cycle"])
+
+        # Tylko to, co mieści się na ekranie
+        for row, (text, color) in enumerate(lines[:height - 2]):
+            stdscr.addstr(row, 0, text[:width - 1], color)
+        if len(lines) > height - 2:
+            stdscr.addstr(height - 2, 0, f"... {len(lines) - (height - 2)} more line(s)", curses.A_DIM)
+        stdscr.addstr(height - 1, 0, "Press any key to return..."[:width - 1], curses.A_DIM)
+        stdscr.refresh()
+        stdscr.getch()
 
     def delete_task_ui(self, stdscr):
         task = self.get_task_by_index(self.selected_index)
@@ -738,10 +1827,7 @@ class TaskManager:
                 stdscr.addstr(5 + idx, 2, f"- {name}")
 
         # Sprawdź, czy jakieś taski zależą od tego taska
-        dependent_tasks = []
-        for t in self.tasks.values():
-            if task.id in t.dependencies:
-                dependent_tasks.append(t.name)
+        dependent_tasks = [t.name for t in self.tasks.dependents(task.id)]
 
         if dependent_tasks:
             offset = 5 + (len(task.dependencies) if task.dependencies else 0)
@@ -765,9 +1851,118 @@ class TaskManager:
             stdscr.refresh()
             stdscr.getch()
 
-def main(stdscr):
-    task_manager = TaskManager()
+def parse_lead_times(value):
+    try:
+        return [int(minutes) for minutes in value.split(",") if minutes.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected comma-separated minutes, e.g. 60,15,0")
+
+def run_headless(task_manager, notify_cmd, lead_times):
+    """Tryb bez TUI: przypomnienia trafiają do polecenia powiadomień albo na stdout"""
+    running = []  # uruchomione polecenia powiadomień; nie czekamy na nie, żeby wolny hook nie blokował schedulera
+
+    def notify(message):
+        if not notify_cmd:
+            print(message, flush=True)
+            return
+        try:
+            running.append(subprocess.Popen(shlex.split(notify_cmd) + [message]))
+        except OSError as error:
+            print(f"notify command failed: {error}", file=sys.stderr, flush=True)
+
+    workspace = task_manager.workspace
+    with closing(workspace.connect()) as conn:
+        def read_data_version():
+            return tuple(conn.execute(f'PRAGMA {schema}.data_version').fetchone()[0]
+                         for _, schema in workspace.shards())
+
+        # Pozycję w dzienniku odczytujemy przed pełnym wczytaniem terminów, żeby nie zgubić zmian pomiędzy
+        last_seen = {project: conn.execute(f'SELECT COALESCE(MAX(seq), 0) FROM {schema}.journal').fetchone()[0]
+                     for project, schema in workspace.shards()}
+        data_version = read_data_version()
+        checked_at = datetime.now()
+        task_manager.reminders = ReminderScheduler(lead_times, notify)
+        task_manager.load_reminders_from_db()
+        try:
+            while True:
+                # data_version zmienia się, gdy inny proces (np. TUI) zapisze zmiany w bazie;
+                # wtedy czytamy tylko nowe wpisy dziennika zamiast wszystkich terminów
+                previous_check, checked_at = checked_at, datetime.now()
+                current_version = read_data_version()
+                if current_version != data_version:
+                    data_version = current_version
+                    task_manager.sync_reminders_from_journal(conn, last_seen, since=previous_check)
+                task_manager.reminders.poll()
+                running[:] = [process for process in running if process.poll() is None]
+                wait = 5.0  # krótko, żeby szybko zauważyć zmiany z innych procesów
+                next_fire = task_manager.reminders.next_fire()
+                if next_fire:
+                    wait = min(wait, max(0.0, (next_fire - datetime.now()).total_seconds()))
+                time.sleep(wait)
+        except KeyboardInterrupt:
+            pass
+
+def main(stdscr, args):
+    task_manager = TaskManager(db_files=args.db, max_cached_tasks=args.max_cached_tasks, page_size=args.page_size,
+                               lead_times=args.lead_times, snapshot_every=args.snapshot_every,
+                               keep_snapshots=args.keep_snapshots)
     task_manager.handle_input(stdscr)
 
 if __name__ == "__main__":
-    curses.wrapper(main)
+    parser = argparse.ArgumentParser(description="Task Manager")
+    parser.add_argument("--db", action="append",
+                        help="project database file; repeat to open several projects as one workspace "
+                             "(default: tasks.db)")
+    parser.add_argument("--max-cached-tasks", type=int, default=0,
+                        help="keep at most N tasks in memory and page the rest from the database (0 = load everything)")
+    parser.add_argument("--page-size", type=int, default=200,
+                        help="number of tasks fetched per database page in bounded-memory mode")
+    parser.add_argument("--lead-times", type=parse_lead_times, default=[60, 15, 0],
+                        help="comma-separated minutes before a due date to remind at (empty string disables reminders)")
+    parser.add_argument("--headless", action="store_true",
+                        help="run only the reminder scheduler, without the TUI")
+    parser.add_argument("--notify-cmd",
+                        help="command run with the reminder text as its last argument in headless mode, "
+                             "e.g. \"notify-send Tasker\"")
+    parser.add_argument("--snapshot-every", type=int, default=500,
+                        help="take a snapshot of a project every N journal entries")
+    parser.add_argument("--keep-snapshots", type=int, default=5,
+                        help="keep only the last N snapshots of a project; --recover-to cannot reach "
+                             "further back than the oldest of them")
+    parser.add_argument("--recover-to", metavar="TIMESTAMP",
+                        help="rebuild a project as it was at 'YYYY-MM-DD[ HH:MM[:SS]]' (a bare date means end of day) "
+                             "into --recover-out")
+    parser.add_argument("--recover-out", metavar="FILE", help="new database file written by --recover-to")
+    parser.add_argument("--project", help="project to recover (default: the first --db)")
+    args = parser.parse_args()
+    args.db = args.db or ["tasks.db"]
+    if len({os.path.abspath(db_file) for db_file in args.db}) > Workspace.MAX_ATTACHED + 1:
+        parser.error(f"a workspace can open at most {Workspace.MAX_ATTACHED + 1} databases "
+                     f"(SQLite attaches at most {Workspace.MAX_ATTACHED} besides the first)")
+    if args.recover_to:
+        if not args.recover_out:
+            parser.error("--recover-to needs --recover-out")
+        task_manager = TaskManager(db_files=args.db, max_cached_tasks=1, lead_times=(),
+                                   keep_snapshots=args.keep_snapshots)
+        if args.project and args.project not in task_manager.workspace.projects:
+            parser.error(f"unknown project: {args.project}")
+        try:
+            replayed = task_manager.recover_to(args.recover_to, args.recover_out, args.project)
+        except (FileExistsError, ValueError) as error:
+            parser.error(f"cannot recover: {error}")
+        print(f"Recovered state at {args.recover_to} into {args.recover_out} ({replayed} journal entries replayed)")
+    elif args.headless:
+        if not args.lead_times:
+            parser.error("--headless needs at least one lead time")
+        if args.notify_cmd is not None:
+            try:
+                notify_argv = shlex.split(args.notify_cmd)
+            except ValueError as error:
+                parser.error(f"invalid --notify-cmd: {error}")
+            if not notify_argv or not shutil.which(notify_argv[0]):
+                parser.error(f"--notify-cmd: command not found: {args.notify_cmd}")
+        # Scheduler czyta terminy prosto z bazy, więc zadań nie trzeba trzymać w pamięci
+        run_headless(TaskManager(db_files=args.db, max_cached_tasks=args.max_cached_tasks or 1, lead_times=()),
+                     args.notify_cmd, args.lead_times)
+    else:
+        curses.wrapper(main, args)
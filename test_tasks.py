@@ -0,0 +1,206 @@
+import sqlite3
+from contextlib import closing
+from datetime import datetime, timedelta
+
+import pytest
+
+from tasks import ReminderScheduler, TaskManager, analyze_dependency_graph
+
+NOW = datetime(2026, 10, 19, 10, 0)
+
+
+def nodes(*ids, status="Pending", due_date="2026-12-01"):
+    return {task_id: (task_id, "main", due_date, status) for task_id in ids}
+
+
+# Analiza zależności; krawędź (a, b) oznacza, że a zależy od b
+
+def test_cycle_reports_only_its_members():
+    analysis = analyze_dependency_graph(nodes("t0", "t1", "t2", "t3"),
+                                        [("t1", "t0"), ("t0", "t1"), ("t2", "t1"), ("t3", "t2")])
+    assert sorted(analysis["cycles"]) == ["t0", "t1"]
+    assert sorted(analysis["behind_cycle"]) == ["t2", "t3"]
+
+
+def test_separate_cycles_and_acyclic_tasks():
+    analysis = analyze_dependency_graph(nodes("a", "b", "c", "d", "e", "f"),
+                                        [("a", "b"), ("b", "c"), ("c", "a"), ("d", "e"), ("e", "d"), ("f", "e")])
+    assert sorted(analysis["cycles"]) == ["a", "b", "c", "d", "e"]
+    assert analysis["behind_cycle"] == ["f"]
+
+
+def test_isolated_task_is_not_a_critical_path():
+    analysis = analyze_dependency_graph(nodes("t0", "t1", "t4"), [("t1", "t0"), ("t0", "t1")])
+    assert analysis["critical_path"] == []
+
+
+def test_critical_path_follows_longest_open_chain():
+    graph = nodes("a", "b", "c", "x")
+    analysis = analyze_dependency_graph(graph, [("b", "a"), ("c", "b")])
+    assert analysis["critical_path"] == ["a", "b", "c"]
+    assert analysis["blocked"] == ["b", "c"]
+
+
+def test_completed_dependencies_do_not_block():
+    graph = dict(nodes("a", status="Completed"), **nodes("b"))
+    analysis = analyze_dependency_graph(graph, [("b", "a")])
+    assert analysis["blocked"] == []
+    assert analysis["critical_path"] == []
+
+
+def test_labels_cover_only_reported_tasks():
+    graph = nodes("a", "b", "idle")
+    analysis = analyze_dependency_graph(graph, [("b", "a")])
+    assert analysis["task_count"] == 3
+    assert set(analysis["labels"]) == {"a", "b"}
+    assert analysis["labels"]["a"] == graph["a"]
+
+
+def test_conflict_when_due_before_dependency():
+    graph = {"early": ("early", "main", "2026-01-01", "Pending"), "late": ("late", "main", "2026-02-01", "Pending")}
+    analysis = analyze_dependency_graph(graph, [("early", "late")])
+    assert analysis["conflicts"] == [("early", "late")]
+
+
+# Przypomnienia
+
+def scheduler(lead_times=(60, 15, 0)):
+    messages = []
+    return ReminderScheduler(lead_times, messages.append), messages
+
+
+def test_reminder_fires_each_lead_once():
+    reminders, messages = scheduler()
+    reminders.load([("a", "A", "2026-10-19 11:00:00", "Pending")], now=NOW)
+    assert reminders.poll(NOW + timedelta(minutes=45)) == ["'A' is due in 15 min (2026-10-19 11:00:00)"]
+    assert reminders.poll(NOW + timedelta(minutes=50)) == []
+    assert reminders.poll(NOW + timedelta(minutes=60)) == ["'A' is due now (2026-10-19 11:00:00)"]
+    assert len(messages) == 2
+
+
+def test_late_poll_collapses_lapsed_leads():
+    reminders, messages = scheduler()
+    reminders.load([("a", "A", "2026-10-19 11:00:00", "Pending")], now=NOW)
+    assert reminders.poll(NOW + timedelta(minutes=50)) == ["'A' is due in 10 min (2026-10-19 11:00:00)"]
+    assert reminders.next_fire() == datetime(2026, 10, 19, 11, 0)
+
+
+def test_overdue_reminder_says_overdue():
+    reminders, messages = scheduler()
+    reminders.load([("a", "A", "2026-10-19 11:00:00", "Pending")], now=NOW)
+    assert reminders.poll(NOW + timedelta(hours=3)) == ["'A' is overdue (2026-10-19 11:00:00)"]
+    assert reminders.next_fire() is None
+
+
+def test_rescheduled_task_drops_old_reminders():
+    reminders, messages = scheduler((0,))
+    reminders.update("a", "A", "2026-10-19 11:00:00", "Pending", now=NOW)
+    reminders.update("a", "A", "2026-10-19 12:00:00", "Pending", now=NOW)
+    reminders.update("b", "B", "2026-10-19 11:00:00", "Completed", now=NOW)
+    assert reminders.poll(NOW + timedelta(hours=1)) == []
+    assert reminders.poll(NOW + timedelta(hours=2)) == ["'A' is due now (2026-10-19 12:00:00)"]
+    reminders.update("c", "C", "2026-10-19 13:00:00", "Pending", now=NOW)
+    reminders.unschedule("c")
+    assert reminders.next_fire() is None
+
+
+def test_sync_reads_only_new_journal_entries(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    editor = TaskManager(lead_times=())
+    editor.add_task("kept", "2099-01-01 10:00:00", "R", "")
+    editor.add_task("gone", "2099-01-01 11:00:00", "R", "")
+    kept, gone = editor.tasks.window(0, 2)
+
+    watcher = TaskManager(max_cached_tasks=1, lead_times=())
+    watcher.reminders, _ = scheduler((0,))
+    watcher.load_reminders_from_db()
+    last_seen = {watcher.workspace.primary: 2}
+    editor.edit_task(kept.id, due_date="2099-01-01 09:00:00")
+    editor.delete_task(gone.id)
+    with closing(watcher.workspace.connect()) as conn:
+        watcher.sync_reminders_from_journal(conn, last_seen)
+    assert last_seen == {watcher.workspace.primary: 4}
+    assert watcher.reminders.next_fire() == datetime(2099, 1, 1, 9, 0)
+    assert gone.id not in watcher.reminders.versions
+
+
+# Dziennik zmian: cofanie, ponawianie i odtwarzanie
+
+def db_state(db_file):
+    with closing(sqlite3.connect(db_file)) as conn:
+        return (sorted(conn.execute('SELECT id, name, due_date, ticket_ref, description, status FROM tasks')),
+                sorted(conn.execute('SELECT task_id, dependency_id FROM dependencies')),
+                sorted(conn.execute('SELECT task_id, comment, timestamp FROM comments')))
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return TaskManager(lead_times=())
+
+
+def test_undo_redo_round_trip(manager):
+    manager.add_task("a", "2099-01-01", "R", "")
+    manager.add_task("b", "2099-01-02", "R", "")
+    a, b = manager.tasks.window(0, 2)
+    b.dependencies.append(a.id)
+    manager.save_task_to_db(b)
+    manager.save_comment_to_db(a.id, "note")
+    before_delete = db_state("tasks.db")
+
+    manager.delete_task(a.id)
+    assert manager.tasks[b.id].dependencies == []
+    after_delete = db_state("tasks.db")
+
+    assert manager.undo()
+    assert db_state("tasks.db") == before_delete
+    assert manager.tasks[b.id].dependencies == [a.id]
+    assert manager.redo()
+    assert db_state("tasks.db") == after_delete
+    assert a.id not in manager.tasks
+
+    while manager.undo():
+        pass
+    assert db_state("tasks.db") == ([], [], [])
+
+
+def test_delete_of_unknown_task_changes_nothing(manager):
+    manager.add_task("a", "2099-01-01", "R", "")
+    manager.delete_task("missing")
+    assert len(manager.tasks) == 1
+    assert len(manager.journal.undo_stack) == 1
+
+
+def test_recover_to_replays_journal_up_to_timestamp(manager):
+    manager.add_task("a", "2099-01-01", "R", "")
+    manager.add_task("b", "2099-01-02", "R", "")
+    state = db_state("tasks.db")
+    (a,) = [task for task in manager.tasks.window(0, 2) if task.name == "a"]
+    manager.edit_task(a.id, name="renamed")
+    with closing(sqlite3.connect("tasks.db")) as conn, conn:
+        conn.execute("UPDATE journal SET timestamp = '2099-06-01 00:00:00' WHERE seq = 3")
+
+    assert manager.recover_to("2099-01-01T00:00", "before.db") == 2
+    assert db_state("before.db") == state
+    assert manager.recover_to("2099-06-01", "after.db") == 3
+    assert db_state("after.db") == db_state("tasks.db")
+
+
+def test_recover_to_rejects_bad_timestamp(manager, tmp_path):
+    with pytest.raises(ValueError):
+        manager.recover_to("garbage", "out.db")
+    assert not (tmp_path / "out.db").exists()
+
+
+def test_old_snapshots_are_pruned(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    manager = TaskManager(lead_times=(), snapshot_every=2, keep_snapshots=2)
+    for i in range(10):
+        manager.add_task(f"t{i}", "2099-01-01", "R", "")
+        manager.journal.take_pending_snapshots()
+    with closing(sqlite3.connect("tasks.db")) as conn:
+        assert [seq for (seq,) in conn.execute('SELECT journal_seq FROM snapshots ORDER BY journal_seq')] == [8, 10]
+        for table in ("snapshot_tasks", "snapshot_dependencies", "snapshot_comments"):
+            assert conn.execute(f'SELECT COUNT(*) FROM {table} WHERE journal_seq < 8').fetchone()[0] == 0
+    assert manager.recover_to("2099-12-31", "out.db") == 0
+    assert db_state("out.db") == db_state("tasks.db")